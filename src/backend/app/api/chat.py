@@ -2,10 +2,11 @@
 Chat API endpoints for AI assistant
 """
 from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
 import logging
 
+from app.core.config import settings
 from app.services.chat_service import ChatService
 from app.api.auth import get_current_user
 from app.models.user import User
@@ -28,6 +29,11 @@ class ChatMessageRequest(BaseModel):
     drone_sign: Optional[str] = None
 
 
+class ChatBatchRequest(BaseModel):
+    """Request model for a batch of chat messages."""
+    messages: List[ChatMessageRequest] = Field(..., max_length=settings.CHAT_BATCH_MAX_SIZE)
+
+
 class InitialDefectMessageRequest(BaseModel):
     """Request model for initial defect message."""
     defect_type: str
@@ -42,10 +48,30 @@ class ChatMessageResponse(BaseModel):
     response: str
 
 
+class ChatBatchResponse(BaseModel):
+    """Response model for a batch of chat messages."""
+    responses: List[str]
+
+
 # Initialize chat service
 chat_service = ChatService(logger)
 
 
+def _send_kwargs(request: ChatMessageRequest) -> Dict[str, Any]:
+    """Map a chat request onto ChatService.send_message arguments."""
+    return {
+        "message": request.message,
+        "sensor_context": request.sensor_context or "",
+        "ml_status_context": request.ml_status_context or "",
+        "defect_id": request.defect_id,
+        "defect_type": request.defect_type,
+        "defect_location": request.defect_location,
+        "defect_severity": request.defect_severity,
+        "control_system_sign": request.control_system_sign,
+        "drone_sign": request.drone_sign
+    }
+
+
 @router.post("/send", response_model=ChatMessageResponse)
 async def send_chat_message(
     request: ChatMessageRequest,
@@ -55,23 +81,31 @@ async def send_chat_message(
     Send chat message to AI assistant and get response.
     """
     try:
-        response = chat_service.send_message(
-            message=request.message,
-            sensor_context=request.sensor_context or "",
-            ml_status_context=request.ml_status_context or "",
-            defect_id=request.defect_id,
-            defect_type=request.defect_type,
-            defect_location=request.defect_location,
-            defect_severity=request.defect_severity,
-            control_system_sign=request.control_system_sign,
-            drone_sign=request.drone_sign
-        )
+        response = chat_service.send_message(**_send_kwargs(request))
         return ChatMessageResponse(response=response)
     except Exception as e:
         logger.error(f"Chat message failed: {e}")
         raise HTTPException(status_code=500, detail=f"Chat service error: {str(e)}")
 
 
+@router.post("/send-batch", response_model=ChatBatchResponse)
+async def send_chat_messages_batch(
+    request: ChatBatchRequest,
+    current_user: User = Depends(get_current_user)
+) -> ChatBatchResponse:
+    """
+    Send several chat messages concurrently and get responses in request order.
+    """
+    try:
+        responses = await chat_service.send_messages_batch(
+            [_send_kwargs(item) for item in request.messages]
+        )
+        return ChatBatchResponse(responses=responses)
+    except Exception as e:
+        logger.error(f"Chat batch failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Chat service error: {str(e)}")
+
+
 @router.post("/initial-defect-message", response_model=ChatMessageResponse)
 async def get_initial_defect_message(
     request: InitialDefectMessageRequest,
@@ -101,7 +135,6 @@ async def chat_health_check():
     """
     try:
         # Simple health check - verify API key is configured
-        from app.core.config import settings
         api_key_configured = bool(settings.OPENAI_API_KEY and settings.OPENAI_API_KEY.strip())
         return {
             "status": "healthy" if api_key_configured else "unhealthy",
@@ -1,7 +1,8 @@
 """
 Detection API endpoints
 """
-from typing import Any, List
+import asyncio
+from typing import Any, List, Optional
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
@@ -33,14 +34,18 @@ async def get_leakage_status(
 
 @router.get("/control-system/summary")
 async def get_control_system_summary(
+    include: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ) -> dict[str, Any]:
     """
     Get control system data summary
+    Returns counts only; pass include=data to also get the data rows
     """
     data_service = DataService(db)
-    return data_service.get_control_system_summary()
+    if include == 'data':
+        return await asyncio.to_thread(data_service.get_control_system_summary)
+    return await asyncio.to_thread(data_service.get_control_system_summary_counts)
 
 
 @router.get("/control-system/data")
@@ -53,24 +58,28 @@ async def get_control_system_data(
     Get control system data
     """
     data_service = DataService(db)
-    summary = data_service.get_control_system_summary()
+    data = await asyncio.to_thread(data_service.get_control_system_summary_data)
     
     return {
-        'total': summary['total'],
-        'data': summary['data'][:limit]
+        'total': len(data),
+        'data': data[:limit]
     }
 
 
 @router.get("/drone/summary")
 async def get_drone_summary(
+    include: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ) -> dict[str, Any]:
     """
     Get drone data summary
+    Returns counts only; pass include=data to also get the data rows
     """
     data_service = DataService(db)
-    return data_service.get_drone_summary()
+    if include == 'data':
+        return await asyncio.to_thread(data_service.get_drone_summary)
+    return await asyncio.to_thread(data_service.get_drone_summary_counts)
 
 
 @router.get("/drone/data")
@@ -83,11 +92,11 @@ async def get_drone_data(
     Get drone data
     """
     data_service = DataService(db)
-    summary = data_service.get_drone_summary()
+    data = await asyncio.to_thread(data_service.get_drone_summary_data)
     
     return {
-        'total': summary['total'],
-        'data': summary['data'][:limit]
+        'total': len(data),
+        'data': data[:limit]
     }
 
 
@@ -121,13 +130,13 @@ async def regenerate_data(
     """
     data_service = DataService(db)
     
-    # Generate and save control system data
+    # Generate and save control system data (CSV I/O off the event loop)
     control_data = data_service.generate_control_system_data(control_system_count)
-    data_service.save_to_csv(control_data, 'control_system_data.csv')
+    await asyncio.to_thread(data_service.save_to_csv, control_data, 'control_system_data.csv')
     
     # Generate and save drone data
     drone_data = data_service.generate_drone_data(drone_count)
-    data_service.save_to_csv(drone_data, 'drone_data.csv')
+    await asyncio.to_thread(data_service.save_to_csv, drone_data, 'drone_data.csv')
     
     return {
         'message': 'Data regenerated successfully',
@@ -190,23 +199,11 @@ async def get_overview_stats(
         # No detections - mark all existing as historical
         data_service.clear_latest_detections()
     
-    # Get summaries
-    control_summary = data_service.get_control_system_summary()
-    drone_summary = data_service.get_drone_summary()
-    
+    # Get summaries (CSV I/O off the event loop)
     return {
         'leakage_status': leakage_status,
-        'control_system': {
-            'total': control_summary['total'],
-            'critical': control_summary['critical'],
-            'warning': control_summary['warning'],
-            'normal': control_summary['normal']
-        },
-        'drone': {
-            'total': drone_summary['total'],
-            'videos': drone_summary['videos'],
-            'images': drone_summary['images']
-        }
+        'control_system': await asyncio.to_thread(data_service.get_control_system_summary_counts),
+        'drone': await asyncio.to_thread(data_service.get_drone_summary_counts)
     }
 
 
@@ -219,12 +216,8 @@ async def export_control_system_csv(
     Get path to control system CSV file for download
     """
     data_service = DataService(db)
-    filepath = data_service.data_dir / 'control_system_data.csv'
-    
-    if not filepath.exists():
-        # Generate if not exists
-        data = data_service.generate_control_system_data(145)
-        data_service.save_to_csv(data, 'control_system_data.csv')
+    # Generate if missing, through the same locked path as the summary routes
+    filepath = await asyncio.to_thread(data_service.ensure_control_system_csv)
     
     return {
         'filename': 'control_system_data.csv',
@@ -242,12 +235,8 @@ async def export_drone_csv(
     Get path to drone CSV file for download
     """
     data_service = DataService(db)
-    filepath = data_service.data_dir / 'drone_data.csv'
-    
-    if not filepath.exists():
-        # Generate if not exists
-        data = data_service.generate_drone_data(2847)
-        data_service.save_to_csv(data, 'drone_data.csv')
+    # Generate if missing, through the same locked path as the summary routes
+    filepath = await asyncio.to_thread(data_service.ensure_drone_csv)
     
     return {
         'filename': 'drone_data.csv',
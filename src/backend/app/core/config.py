@@ -29,6 +29,9 @@ class Settings(BaseSettings):
     OPENAI_MODEL: str = Field(default="gpt-4.1-nano")
     OPENAI_API_URL: str = Field(default="https://api.openai.com/v1/chat/completions")
     OPENAI_TEMPERATURE: float = Field(default=0.7)
+    CHAT_CACHE_SIZE: int = Field(default=256)
+    CHAT_BATCH_MAX_SIZE: int = Field(default=16)
+    CHAT_BATCH_CONCURRENCY: int = Field(default=4)
 
     # CORS settings - computed field, not from env
     @property
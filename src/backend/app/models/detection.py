@@ -1,7 +1,7 @@
 """
 Detection data models for control system and drone data
 """
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, Index, text
 from sqlalchemy.sql import func
 from app.db.base import Base
 
@@ -57,6 +57,17 @@ class DetectionEvent(Base):
     - is_latest=False: Historical detection in registry (up to 15 total)
     """
     __tablename__ = "detection_events"
+    __table_args__ = (
+        # Serves is_latest filters and last_updated ordering (registry, pruning)
+        Index('ix_detevt_latest_updated', 'is_latest', 'last_updated'),
+        # Partial index over the few current detections (Overview lookups); only
+        # created where partial indexes exist, the composite index covers the rest
+        Index(
+            'ix_detection_events_is_latest', 'last_updated',
+            sqlite_where=text('is_latest = 1'),
+            postgresql_where=text('is_latest'),
+        ).ddl_if(dialect=('sqlite', 'postgresql')),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     event_id = Column(String(50), unique=True, nullable=False)
@@ -1,13 +1,42 @@
 """Chat service for OpenAI API integration."""
 
+import asyncio
 import httpx
 import logging
-from typing import Dict, Any, List, Optional
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 from app.core.config import settings
 from app.services.defect_knowledge import DefectKnowledge
 
 
+# Compact rule set - same policy as the original prose prompt at ~half the tokens
+_SYSTEM_PROMPT = """
+ROLE: senior gas/oil pipeline inspector (monitoring, leak detection, integrity, safety). Answer operator questions from the given data.
+INPUTS: 1) live sensor stats (5-min aggregates) 2) ML health status + fault type (last 5 readings) 3) operator question.
+
+LANGUAGE:
+- Detect language ONLY from the operator question (text after "User Question:" or the main message).
+- Ignore defect IDs (DEF-001), location codes (Sector A-7, KM 125.3), sensor names, units, timestamps, metadata and context sections.
+- Never answer in Persian unless the operator wrote in Farsi/Persian. Never mix languages.
+
+BEHAVIOR:
+- Natural, flexible answers as a senior inspector; focus on monitoring, leaks, integrity, safety.
+- Use only provided sensor/ML data; never invent measurements or events.
+- If data is missing or insufficient, say so; keep assumptions minimal.
+- Safety over production/efficiency.
+
+LEAK INDICATORS (when relevant): pressure drops/differentials, unexpected flow changes, acoustic/vibration anomalies, local temperature changes, ML fault/degradation trends, corrosion/integrity signals.
+
+SEVERITY: bold only when justified by evidence: **Normal**, **Warning**, **Critical**, **Leak Detected**, **Immediate Action Required**. Do not exaggerate; recommend emergency shutdown only on evidence of imminent danger.
+
+CHECK: answer the actual question; conclusions supported by data or stated uncertainty; safety advice proportional to evidence.
+""".strip()
+
+
 class ChatConfig:
     """Configuration for chat service."""
     def __init__(self):
@@ -15,6 +44,47 @@ class ChatConfig:
         self.model = settings.OPENAI_MODEL
         self.api_url = settings.OPENAI_API_URL
         self.temperature = settings.OPENAI_TEMPERATURE
+        self.cache_size = settings.CHAT_CACHE_SIZE
+        self.batch_concurrency = settings.CHAT_BATCH_CONCURRENCY
+
+
+class ResponseCache:
+    """
+    Bounded LRU cache of chat completions.
+    Questions are normalized (case and whitespace only) so that repeats of the
+    same question in the same context skip the API call.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(message: str) -> str:
+        """Lowercase a question and collapse its whitespace"""
+        # Punctuation is kept: operators, decimals and units ("> 50", "1.5%") change the meaning
+        return " ".join(message.lower().split())
+
+    def get(self, context: str, message: str) -> Optional[str]:
+        """Return cached response for (context, message) or None"""
+        key = (context, self.normalize(message))
+        with self._lock:
+            response = self._entries.get(key)
+            if response is not None:
+                self._entries.move_to_end(key)
+            return response
+
+    def put(self, context: str, message: str, response: str) -> None:
+        """Store response, evicting the least recently used entry if full"""
+        if self.max_size <= 0:
+            return
+        key = (context, self.normalize(message))
+        with self._lock:
+            self._entries[key] = response
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
 
 
 class ChatService:
@@ -24,6 +94,34 @@ class ChatService:
         self.config = ChatConfig()
         self.logger = logger
         self.system_prompt = self._get_system_prompt()
+        self.response_cache = ResponseCache(self.config.cache_size)
+        # Created on first use and released by close(); a later call recreates them,
+        # so the module-level service survives repeated app startups/shutdowns
+        self._client: Optional[httpx.Client] = None
+        self._batch_executor: Optional[ThreadPoolExecutor] = None
+        self._resource_lock = threading.Lock()
+
+    @property
+    def client(self) -> httpx.Client:
+        """Shared client: pooled keep-alive connection, HTTP/2 multiplexes concurrent calls."""
+        with self._resource_lock:
+            if self._client is None or self._client.is_closed:
+                self._client = httpx.Client(timeout=90.0, http2=True)
+            return self._client
+
+    @property
+    def batch_executor(self) -> ThreadPoolExecutor:
+        """
+        Batch calls get their own small pool so slow completions cannot exhaust
+        the default executor that the detection routes use for CSV I/O.
+        """
+        with self._resource_lock:
+            if self._batch_executor is None:
+                self._batch_executor = ThreadPoolExecutor(
+                    max_workers=max(1, self.config.batch_concurrency),
+                    thread_name_prefix="chat-batch"
+                )
+            return self._batch_executor
 
     def get_initial_defect_message(
         self,
@@ -78,6 +176,11 @@ class ChatService:
 
             system_message = f"{self.system_prompt}\n\n{defect_context}\n\n{sensor_context}\n\n{ml_status_context}"
 
+            # Same question in the same context - reuse the previous answer
+            cached = self.response_cache.get(system_message, message)
+            if cached is not None:
+                return cached
+
             payload = {
                 "model": self.config.model,
                 "messages": [
@@ -92,83 +195,44 @@ class ChatService:
                 "Authorization": f"Bearer {api_key}"
             }
 
-            with httpx.Client(timeout=90.0) as client:
-                response = client.post(self.config.api_url, json=payload, headers=headers)
+            response = self.client.post(self.config.api_url, json=payload, headers=headers)
 
             if response.status_code != 200:
-                self.logger.error(f"OpenAI API error: {response.status_code} - {response.text}")
+                self.logger.error("OpenAI API error: %s - %s", response.status_code, response.content[:512])
                 raise Exception(f"API request failed: {response.status_code}")
 
             data = response.json()
-            return data["choices"][0]["message"]["content"]
+            content = data["choices"][0]["message"]["content"]
+            self.response_cache.put(system_message, message, content)
+            return content
 
         except Exception as e:
-            self.logger.error(f"Chat service error: {e}")
+            self.logger.error("Chat service error: %s", e)
             raise
 
+    async def send_messages_batch(self, items: List[Dict[str, Any]]) -> List[str]:
+        """
+        Send several chat messages concurrently.
+        Each item holds the keyword arguments of send_message; all requests share
+        the pooled HTTP/2 connection instead of opening one connection each.
+        At most CHAT_BATCH_CONCURRENCY requests are in flight at a time.
+        """
+        loop = asyncio.get_running_loop()
+        executor = self.batch_executor
+        return await asyncio.gather(
+            *(loop.run_in_executor(executor, partial(self.send_message, **item)) for item in items)
+        )
+
+    def close(self) -> None:
+        """Release the batch worker threads and the pooled HTTP connection (recreated on next use)."""
+        with self._resource_lock:
+            executor, self._batch_executor = self._batch_executor, None
+            client, self._client = self._client, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        if client is not None:
+            client.close()
+
     def _get_system_prompt(self) -> str:
         """Get the system prompt."""
-        return """
-    You are a professional inspector specializing in gas and oil pipeline monitoring and leakage detection.
-    Your role is to analyze provided sensor data and ML health information, reason like an experienced field inspector, and answer operator questions about pipeline condition, leaks, integrity, and safety.
-
-    You will be given:
-    1) Live sensor statistics (5-minute aggregates)
-    2) ML health status and fault type (last 5 readings)
-    3) Operator Question (the ONLY source for language detection)
-
-    ━━━━━━━━━━━━━━━━━━━━━━━━
-    LANGUAGE DETECTION (CRITICAL)
-    ━━━━━━━━━━━━━━━━━━━━━━━━
-    **ONLY analyze the operator's actual question text for language detection.**
-    
-    **IGNORE when detecting language:**
-    - Defect IDs (e.g., DEF-001, DEF-002)
-    - Location codes (e.g., Sector A-7, KM 125.3)
-    - Technical metadata and system-generated text
-    - Sensor names, units, timestamps
-    - Any text in context sections that is NOT the operator's question
-    
-    **Language Rules:**
-    1. NEVER say persian until the user spoke with you with farsi or persian
-    2. NEVER mix languages in a single response
-    3. The operator's question is the text after "User Question:" or the main message content
-
-    ━━━━━━━━━━━━━━━━━━━━━━━━
-    GENERAL BEHAVIOR
-    ━━━━━━━━━━━━━━━━━━━━━━━━
-    - Answer naturally and flexibly, like a senior pipeline inspector speaking to operators.
-    - Focus on pipeline monitoring, leak detection, integrity assessment, and operational safety.
-    - Use only the provided sensor data and ML outputs; do not invent measurements or events.
-    - If data is insufficient or missing, state that clearly instead of guessing.
-    - Keep assumptions minimal and clearly implied by the data.
-    - Safety has priority over production or efficiency.
-
-    ━━━━━━━━━━━━━━━━━━━━━━━━
-    LEAK-AWARE REASONING
-    ━━━━━━━━━━━━━━━━━━━━━━━━
-    When relevant to the question, consider common leak indicators:
-    - Pressure drops or abnormal pressure differentials
-    - Unexpected flow rate changes
-    - Acoustic or vibration anomalies (if available)
-    - Localized temperature changes
-    - ML fault or degradation trends
-    - Corrosion or integrity-related signals
-
-    ━━━━━━━━━━━━━━━━━━━━━━━━
-    SEVERITY LANGUAGE
-    ━━━━━━━━━━━━━━━━━━━━━━━━
-    Use **bold** only for critical states or keywords when justified by evidence:
-    **Normal**, **Warning**, **Critical**, **Leak Detected**, **Immediate Action Required**
-
-    Do NOT exaggerate severity.
-    Recommend emergency shutdown only when evidence indicates imminent danger.
-
-    ━━━━━━━━━━━━━━━━━━━━━━━━
-    FINAL CHECK
-    ━━━━━━━━━━━━━━━━━━━━━━━━
-    Before responding, internally confirm that:
-    - The answer directly addresses the operator’s question
-    - Conclusions are supported by the provided data or clearly stated uncertainty
-    - Safety recommendations are proportional to the evidence
-    """.strip()
+        return _SYSTEM_PROMPT
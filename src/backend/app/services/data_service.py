@@ -4,10 +4,19 @@ Data service for generating and managing detection data
 import random
 import csv
 import os
+import stat
+import tempfile
+import threading
+from collections import Counter
+from functools import lru_cache
+from itertools import zip_longest
+from operator import itemgetter, methodcaller
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Callable
 from pathlib import Path
+from uuid import uuid4
 
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.models.detection import ControlSystemData, DroneData, DetectionEvent
 
@@ -89,6 +98,106 @@ LOCATIONS = [
     'Main Pipeline KM 12.5', 'Main Pipeline KM 18.3'
 ]
 
+# Precomputed scenario views (computed once at import)
+# Parallel tuples indexed by scenario position; signatures are (sign, source) pairs
+DEFECT_TYPES = tuple(d['type'] for d in DEFECT_SCENARIOS)
+DEFECT_CS_SIGNATURES = tuple(
+    tuple((sig['sign'], sig['source']) for sig in d['control_system']) for d in DEFECT_SCENARIOS
+)
+DEFECT_DRONE_SIGNATURES = tuple(
+    tuple((sig['sign'], sig['source']) for sig in d['drone']) for d in DEFECT_SCENARIOS
+)
+# Scenarios that have both control system AND drone signatures
+BOTH_INDICES = tuple(
+    i for i in range(len(DEFECT_SCENARIOS)) if DEFECT_CS_SIGNATURES[i] and DEFECT_DRONE_SIGNATURES[i]
+)
+CS_ANOMALY_SIGNS = [sig['sign'] for d in DEFECT_SCENARIOS for sig in d['control_system']]
+DRONE_ANOMALY_SIGNS = [sig['sign'] for d in DEFECT_SCENARIOS for sig in d['drone']]
+RISK_BY_TYPE = {d['type']: d['risk_level'] for d in DEFECT_SCENARIOS}
+
+# Sample data generation parameters
+CS_SENSOR_TYPES = ('PT', 'FT', 'TT', 'Seismometer')
+CS_READING_SPECS = {
+    # sensor type: (min, max, decimals, unit)
+    'PT': (40.0, 50.0, 2, 'PSI'),  # Pressure
+    'FT': (1000, 1500, 2, 'm³/h'),  # Flow
+    'TT': (15.0, 25.0, 2, '°C'),  # Temperature
+    'Seismometer': (0.0, 0.5, 3, 'mm/s')
+}
+DRONE_SENSOR_TYPES = ('Visible spectrum camera', 'Thermal imaging camera', 'Spectroscopic sensor')
+MEDIA_TYPES = ('image', 'video')
+LOCATION_INDICES = range(len(LOCATIONS))
+LOCATIONS_DASH = tuple(location.replace(' ', '-') for location in LOCATIONS)  # sensor ids
+LOCATIONS_UND = tuple(location.replace(' ', '_') for location in LOCATIONS)  # media paths
+MINUTE_OFFSETS = tuple(timedelta(minutes=m) for m in range(0, 1441))  # Last 24 hours
+SENSOR_NUMBERS = range(1, 6)
+ANOMALY_RATE = 0.1
+CRITICAL_RATE = ANOMALY_RATE * 0.3
+
+
+# Serializes the missing/empty check and sample generation for data CSVs
+_CSV_GENERATE_LOCK = threading.Lock()
+
+# Process umask, read once at import (os.umask can only be read by setting it)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+# (path, inode, size, mtime_ns) of a CSV file - identifies one version of its contents
+CsvKey = Tuple[str, int, int, int]
+
+
+def _csv_key(filepath: Path) -> CsvKey:
+    """Stat a CSV file once and build its cache key"""
+    st = filepath.stat()
+    return str(filepath), st.st_ino, st.st_size, st.st_mtime_ns
+
+
+@lru_cache(maxsize=8)
+def _read_csv(key: CsvKey) -> Tuple[Dict[str, Any], ...]:
+    """
+    Parse a CSV file into row dicts
+    Cached per CsvKey - replacing or rewriting the file changes the key and
+    invalidates the entry automatically. The cached row dicts are shared:
+    callers must not mutate them (hand out copies via _copy_rows)
+    """
+    path = key[0]
+    # Zip rows against the header once instead of DictReader's per-row bookkeeping;
+    # ragged rows fall back to DictReader semantics (see _ragged_row)
+    with open(path, 'r', newline='', encoding='utf-8') as csvfile:
+        reader = csv.reader(csvfile)
+        fieldnames = next(reader, None)
+        if not fieldnames:
+            return ()
+        width = len(fieldnames)
+        return tuple(
+            dict(zip(fieldnames, row)) if len(row) == width else _ragged_row(fieldnames, row)
+            for row in reader if row
+        )
+
+
+def _ragged_row(fieldnames: List[str], row: List[str]) -> Dict[Any, Any]:
+    """Map a row whose length differs from the header the way csv.DictReader does"""
+    # Short rows are padded with None, extra cells are collected under the None key
+    width = len(fieldnames)
+    if len(row) < width:
+        return dict(zip_longest(fieldnames, row))
+    values = dict(zip(fieldnames, row))
+    values[None] = row[width:]
+    return values
+
+
+@lru_cache(maxsize=8)
+def _count_values(key: CsvKey, column: str) -> Dict[str, int]:
+    """Count the values of one CSV column, cached alongside the parsed rows"""
+    # map + methodcaller keeps the whole count in C (no generator frame per row);
+    # .get tolerates files whose header lacks the column
+    return dict(Counter(map(methodcaller('get', column), _read_csv(key))))
+
+
+def _copy_rows(key: CsvKey) -> List[Dict[str, Any]]:
+    """Return caller-owned copies of the cached rows of a CSV file"""
+    return [row.copy() for row in _read_csv(key)]
+
 
 class DataService:
     """Service for managing detection data"""
@@ -116,32 +225,32 @@ class DataService:
         # Determine number of leakages (1-3)
         num_leakages = random.randint(1, 3)
         
+        # Generate multiple leakages - BOTH systems detect the SAME defect(s)
+        # Only select defects that have both control system AND drone signatures
+        indices = random.choices(BOTH_INDICES, k=num_leakages)
+        locations = random.choices(LOCATIONS, k=num_leakages)
+        
         control_system_detections = []
         drone_detections = []
         
-        # Generate multiple leakages - BOTH systems detect the SAME defect(s)
-        for _ in range(num_leakages):
-            # Only select defects that have both control system AND drone signatures
-            defects_with_both = [d for d in DEFECT_SCENARIOS 
-                                if d['control_system'] and d['drone']]
-            selected_defect = random.choice(defects_with_both)
-            location = random.choice(LOCATIONS)
+        for i, location in zip(indices, locations):
+            defect_type = DEFECT_TYPES[i]
             
             # BOTH systems detect this defect
-            control_sig = random.choice(selected_defect['control_system'])
-            drone_sig = random.choice(selected_defect['drone'])
+            control_sign, control_source = random.choice(DEFECT_CS_SIGNATURES[i])
+            drone_sign, drone_source = random.choice(DEFECT_DRONE_SIGNATURES[i])
             
             control_system_detections.append({
-                'defect_type': selected_defect['type'],
-                'sign': control_sig['sign'],
-                'source': control_sig['source'],
+                'defect_type': defect_type,
+                'sign': control_sign,
+                'source': control_source,
                 'location': location
             })
             
             drone_detections.append({
-                'defect_type': selected_defect['type'],
-                'sign': drone_sig['sign'],
-                'source': drone_sig['source'],
+                'defect_type': defect_type,
+                'sign': drone_sign,
+                'source': drone_source,
                 'location': location
             })
         
@@ -159,72 +268,73 @@ class DataService:
     
     def generate_control_system_data(self, count: int = 100) -> List[Dict[str, Any]]:
         """Generate sample control system data"""
-        data = []
         now = datetime.now()
         
-        for i in range(count):
-            timestamp = now - timedelta(minutes=random.randint(0, 1440))  # Last 24 hours
-            location = random.choice(LOCATIONS)
-            sensor_type = random.choice(['PT', 'FT', 'TT', 'Seismometer'])
-            
+        # Draw every random field for all rows in batches
+        offsets = random.choices(MINUTE_OFFSETS, k=count)
+        location_indices = random.choices(LOCATION_INDICES, k=count)
+        sensor_types = random.choices(CS_SENSOR_TYPES, k=count)
+        readings = [random.random() for _ in range(count)]
+        anomaly_rolls = [random.random() for _ in range(count)]
+        sensor_numbers = random.choices(SENSOR_NUMBERS, k=count)
+        
+        data = []
+        for offset, loc, sensor_type, reading, roll, sensor_number in zip(
+            offsets, location_indices, sensor_types, readings, anomaly_rolls, sensor_numbers
+        ):
             # Generate realistic readings based on sensor type
-            if sensor_type == 'PT':  # Pressure
-                reading_value = round(random.uniform(40.0, 50.0), 2)
-                reading_unit = 'PSI'
-            elif sensor_type == 'FT':  # Flow
-                reading_value = round(random.uniform(1000, 1500), 2)
-                reading_unit = 'm³/h'
-            elif sensor_type == 'TT':  # Temperature
-                reading_value = round(random.uniform(15.0, 25.0), 2)
-                reading_unit = '°C'
-            else:  # Seismometer
-                reading_value = round(random.uniform(0.0, 0.5), 3)
-                reading_unit = 'mm/s'
+            low, high, digits, reading_unit = CS_READING_SPECS[sensor_type]
             
-            # 10% chance of anomaly
-            anomaly_detected = random.random() < 0.1
-            status = 'critical' if anomaly_detected and random.random() < 0.3 else \
+            # 10% chance of anomaly, 30% of anomalies are critical
+            anomaly_detected = roll < ANOMALY_RATE
+            status = 'critical' if roll < CRITICAL_RATE else \
                     'warning' if anomaly_detected else 'normal'
             
             data.append({
-                'timestamp': timestamp.isoformat(),
-                'location': location,
+                'timestamp': (now - offset).isoformat(),
+                'location': LOCATIONS[loc],
                 'sensor_type': sensor_type,
-                'sensor_id': f'{sensor_type}-{location.replace(" ", "-")}-{random.randint(1, 5)}',
-                'reading_value': reading_value,
+                'sensor_id': f'{sensor_type}-{LOCATIONS_DASH[loc]}-{sensor_number}',
+                'reading_value': round(low + (high - low) * reading, digits),
                 'reading_unit': reading_unit,
                 'status': status,
                 'anomaly_detected': anomaly_detected,
-                'anomaly_type': random.choice([d['sign'] for d in random.choice([s for s in DEFECT_SCENARIOS if s['control_system']])['control_system']]) if anomaly_detected else None
+                'anomaly_type': random.choice(CS_ANOMALY_SIGNS) if anomaly_detected else None
             })
         
         return data
     
     def generate_drone_data(self, count: int = 50) -> List[Dict[str, Any]]:
         """Generate sample drone data"""
-        data = []
         now = datetime.now()
         
-        for i in range(count):
-            timestamp = now - timedelta(minutes=random.randint(0, 1440))  # Last 24 hours
-            location = random.choice(LOCATIONS)
-            sensor_type = random.choice(['Visible spectrum camera', 'Thermal imaging camera', 'Spectroscopic sensor'])
-            media_type = random.choice(['image', 'video'])
+        # Draw every random field for all rows in batches
+        offsets = random.choices(MINUTE_OFFSETS, k=count)
+        location_indices = random.choices(LOCATION_INDICES, k=count)
+        sensor_types = random.choices(DRONE_SENSOR_TYPES, k=count)
+        media_types = random.choices(MEDIA_TYPES, k=count)
+        anomaly_rolls = [random.random() for _ in range(count)]
+        
+        data = []
+        for i, (offset, loc, sensor_type, media_type, roll) in enumerate(zip(
+            offsets, location_indices, sensor_types, media_types, anomaly_rolls
+        )):
+            timestamp = now - offset
             
-            # 10% chance of anomaly
-            anomaly_detected = random.random() < 0.1
-            status = 'critical' if anomaly_detected and random.random() < 0.3 else \
+            # 10% chance of anomaly, 30% of anomalies are critical
+            anomaly_detected = roll < ANOMALY_RATE
+            status = 'critical' if roll < CRITICAL_RATE else \
                     'warning' if anomaly_detected else 'normal'
             
             data.append({
                 'timestamp': timestamp.isoformat(),
-                'location': location,
+                'location': LOCATIONS[loc],
                 'sensor_type': sensor_type,
                 'media_type': media_type,
-                'media_path': f'/media/drone/{timestamp.strftime("%Y%m%d")}/{location.replace(" ", "_")}_{i}.{media_type}',
+                'media_path': f'/media/drone/{timestamp.strftime("%Y%m%d")}/{LOCATIONS_UND[loc]}_{i}.{media_type}',
                 'status': status,
                 'anomaly_detected': anomaly_detected,
-                'anomaly_type': random.choice([d['sign'] for d in random.choice([s for s in DEFECT_SCENARIOS if s['drone']])['drone']]) if anomaly_detected else None,
+                'anomaly_type': random.choice(DRONE_ANOMALY_SIGNS) if anomaly_detected else None,
                 'ai_confidence': round(random.uniform(85, 99), 2) if anomaly_detected else None
             })
         
@@ -237,10 +347,29 @@ class DataService:
         if not data:
             return
         
-        with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=data[0].keys())
-            writer.writeheader()
-            writer.writerows(data)
+        # Plain writer over pre-extracted value tuples (cheaper than DictWriter)
+        fieldnames = list(data[0].keys())
+        get_values = itemgetter(*fieldnames)
+        
+        # Write a temp file in the same directory and swap it in atomically, so
+        # concurrent readers see either the old or the new file, never a partial one
+        fd, tmp_path = tempfile.mkstemp(dir=self.data_dir, prefix=f".{filename}.", suffix='.tmp')
+        try:
+            # mkstemp creates 0600 files; keep the existing file's mode, or the
+            # mode open() would have used for a new file
+            try:
+                mode = stat.S_IMODE(filepath.stat().st_mode)
+            except FileNotFoundError:
+                mode = 0o666 & ~_UMASK
+            os.chmod(tmp_path, mode)
+            with open(fd, 'w', newline='', encoding='utf-8', buffering=1 << 20) as csvfile:
+                writer = csv.writer(csvfile)
+                writer.writerow(fieldnames)
+                writer.writerows(get_values(row) for row in data)
+            os.replace(tmp_path, filepath)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
     
     def load_from_csv(self, filename: str) -> List[Dict[str, Any]]:
         """Load data from CSV file"""
@@ -249,50 +378,86 @@ class DataService:
         if not filepath.exists():
             return []
         
-        with open(filepath, 'r', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            return list(reader)
+        return _copy_rows(_csv_key(filepath))
     
-    def get_control_system_summary(self) -> Dict[str, Any]:
-        """Get summary statistics for control system data"""
-        data = self.load_from_csv('control_system_data.csv')
-        
-        if not data:
-            # Generate and save if not exists
-            data = self.generate_control_system_data(145)
-            self.save_to_csv(data, 'control_system_data.csv')
+    def _csv_cache_key(self, filename: str, generate: Callable[[], List[Dict[str, Any]]]) -> CsvKey:
+        """
+        Get the cache key of a data CSV
+        Generates and saves sample data first if the file is missing or empty
+        """
+        filepath = self.data_dir / filename
         
-        total = len(data)
-        critical = sum(1 for d in data if d.get('status') == 'critical')
-        warning = sum(1 for d in data if d.get('status') == 'warning')
+        with _CSV_GENERATE_LOCK:
+            if not filepath.exists() or not _read_csv(_csv_key(filepath)):
+                self.save_to_csv(generate(), filename)
+            
+            return _csv_key(filepath)
+    
+    def _control_system_csv_key(self) -> CsvKey:
+        return self._csv_cache_key('control_system_data.csv', lambda: self.generate_control_system_data(145))
+    
+    def _drone_csv_key(self) -> CsvKey:
+        return self._csv_cache_key('drone_data.csv', lambda: self.generate_drone_data(2847))
+    
+    def ensure_control_system_csv(self) -> Path:
+        """Get the control system CSV path, generating sample data if missing or empty"""
+        return Path(self._control_system_csv_key()[0])
+    
+    def ensure_drone_csv(self) -> Path:
+        """Get the drone CSV path, generating sample data if missing or empty"""
+        return Path(self._drone_csv_key()[0])
+    
+    def get_control_system_summary_counts(self) -> Dict[str, int]:
+        """Get summary statistics for control system data (counts only)"""
+        key = self._control_system_csv_key()
+        
+        total = len(_read_csv(key))
+        status_counts = _count_values(key, 'status')
+        critical = status_counts.get('critical', 0)
+        warning = status_counts.get('warning', 0)
         normal = total - critical - warning
         
         return {
             'total': total,
             'critical': critical,
             'warning': warning,
-            'normal': normal,
-            'data': data
+            'normal': normal
         }
     
-    def get_drone_summary(self) -> Dict[str, Any]:
-        """Get summary statistics for drone data"""
-        data = self.load_from_csv('drone_data.csv')
-        
-        if not data:
-            # Generate and save if not exists
-            data = self.generate_drone_data(2847)
-            self.save_to_csv(data, 'drone_data.csv')
+    def get_control_system_summary_data(self) -> List[Dict[str, Any]]:
+        """Get control system data rows"""
+        return _copy_rows(self._control_system_csv_key())
+    
+    def get_control_system_summary(self) -> Dict[str, Any]:
+        """Get summary statistics for control system data"""
+        return {
+            **self.get_control_system_summary_counts(),
+            'data': self.get_control_system_summary_data()
+        }
+    
+    def get_drone_summary_counts(self) -> Dict[str, int]:
+        """Get summary statistics for drone data (counts only)"""
+        key = self._drone_csv_key()
         
-        total = len(data)
-        videos = sum(1 for d in data if d.get('media_type') == 'video')
+        total = len(_read_csv(key))
+        videos = _count_values(key, 'media_type').get('video', 0)
         images = total - videos
         
         return {
             'total': total,
             'videos': videos,
-            'images': images,
-            'data': data
+            'images': images
+        }
+    
+    def get_drone_summary_data(self) -> List[Dict[str, Any]]:
+        """Get drone data rows"""
+        return _copy_rows(self._drone_csv_key())
+    
+    def get_drone_summary(self) -> Dict[str, Any]:
+        """Get summary statistics for drone data"""
+        return {
+            **self.get_drone_summary_counts(),
+            'data': self.get_drone_summary_data()
         }
     
     def store_detection_event(self, leakage_status: Dict[str, Any]) -> List[DetectionEvent]:
@@ -302,75 +467,68 @@ class DataService:
         2. Store new detections as 'latest' (is_latest=True)
         3. Maintain max 15 historical events (delete oldest if needed)
         """
+        # Nothing detected - only demote current detections, skip count/prune
+        if not leakage_status['control_system']['detections'] and not leakage_status['drone']['detections']:
+            self.clear_latest_detections()
+            return []
+        
         events = []
+        now = datetime.now()
+        ts_str = now.strftime('%Y%m%d%H%M%S')
         
         # Step 1: Mark all current 'latest' detections as historical
-        current_latest = self.db.query(DetectionEvent).filter(
-            DetectionEvent.is_latest == True
-        ).all()
+        self._demote_latest_detections(now)
         
-        for event in current_latest:
-            event.is_latest = False
-            event.last_updated = datetime.now()
-        
-        # Group detections by location and defect type
-        location_defect_map = {}
-        
-        # Add control system detections
-        for detection in leakage_status['control_system']['detections']:
-            key = f"{detection['location']}-{detection['defect_type']}"
-            if key not in location_defect_map:
-                location_defect_map[key] = {}
-            location_defect_map[key]['control_system'] = detection
-        
-        # Add drone detections
-        for detection in leakage_status['drone']['detections']:
-            key = f"{detection['location']}-{detection['defect_type']}"
-            if key not in location_defect_map:
-                location_defect_map[key] = {}
-            location_defect_map[key]['drone'] = detection
+        # Control system and drone detections are generated in lockstep:
+        # the same index is the same defect at the same location
+        confirmed = list(zip(
+            leakage_status['control_system']['detections'],
+            leakage_status['drone']['detections']
+        ))
         
         # Step 2: Create NEW detection events as 'latest' for items detected by BOTH systems
-        for key, detections in location_defect_map.items():
-            if 'control_system' in detections and 'drone' in detections:
-                location = detections['control_system']['location']
-                defect_type = detections['control_system']['defect_type']
-                
-                # Find risk level
-                risk_level = next((s['risk_level'] for s in DEFECT_SCENARIOS if s['type'] == defect_type), 'warning')
-                
-                # Always create NEW event as latest (don't update existing)
-                event = DetectionEvent(
-                    event_id=f"EVT-{datetime.now().strftime('%Y%m%d%H%M%S')}-{random.randint(1000, 9999)}",
-                    location=location,
-                    defect_type=defect_type,
-                    risk_level=risk_level,
-                    control_system_detected=True,
-                    control_system_sign=detections['control_system']['sign'],
-                    control_system_source=detections['control_system']['source'],
-                    drone_detected=True,
-                    drone_sign=detections['drone']['sign'],
-                    drone_source=detections['drone']['source'],
-                    status='pending' if risk_level == 'critical' else 'progress',
-                    is_latest=True,  # Mark as current/latest detection
-                    ai_confidence=round(random.uniform(85, 99), 2),
-                    last_updated=datetime.now()
-                )
-                self.db.add(event)
-                events.append(event)
+        for control_detection, drone_detection in confirmed:
+            location = control_detection['location']
+            defect_type = control_detection['defect_type']
+            
+            # Find risk level
+            risk_level = RISK_BY_TYPE.get(defect_type, 'warning')
+            
+            # Always create NEW event as latest (don't update existing)
+            event = DetectionEvent(
+                # Random suffix keeps ids unique across calls within the same second
+                event_id=f"EVT-{ts_str}-{uuid4().hex[:8]}",
+                location=location,
+                defect_type=defect_type,
+                risk_level=risk_level,
+                control_system_detected=True,
+                control_system_sign=control_detection['sign'],
+                control_system_source=control_detection['source'],
+                drone_detected=True,
+                drone_sign=drone_detection['sign'],
+                drone_source=drone_detection['source'],
+                status='pending' if risk_level == 'critical' else 'progress',
+                is_latest=True,  # Mark as current/latest detection
+                ai_confidence=round(random.uniform(85, 99), 2),
+                last_updated=now
+            )
+            events.append(event)
+        
+        self.db.add_all(events)
         
         # Step 3: Maintain max 15 historical events (delete oldest if exceeded)
         total_events = self.db.query(DetectionEvent).count() + len(events)
         if total_events > 15:
-            # Get oldest historical events to delete
-            events_to_delete = self.db.query(DetectionEvent).filter(
+            # Delete oldest historical events in a single statement
+            oldest_ids = select(DetectionEvent.id).where(
                 DetectionEvent.is_latest == False
             ).order_by(
                 DetectionEvent.last_updated.asc()
-            ).limit(total_events - 15).all()
+            ).limit(total_events - 15)
             
-            for event in events_to_delete:
-                self.db.delete(event)
+            self.db.query(DetectionEvent).filter(
+                DetectionEvent.id.in_(oldest_ids)
+            ).delete(synchronize_session=False)
         
         self.db.commit()
         return events
@@ -403,26 +561,42 @@ class DataService:
 
     def get_recent_detection_events(self, limit: int = 15) -> List[Dict[str, Any]]:
         """Get recent detection events"""
-        events = self.db.query(DetectionEvent).order_by(
+        # Project only the needed columns - plain rows, no ORM object hydration
+        rows = self.db.query(
+            DetectionEvent.event_id,
+            DetectionEvent.defect_type,
+            DetectionEvent.location,
+            DetectionEvent.risk_level,
+            DetectionEvent.timestamp,
+            DetectionEvent.last_updated,
+            DetectionEvent.status,
+            DetectionEvent.control_system_sign,
+            DetectionEvent.control_system_source,
+            DetectionEvent.drone_sign,
+            DetectionEvent.drone_source,
+            DetectionEvent.ai_confidence
+        ).order_by(
             DetectionEvent.last_updated.desc()
         ).limit(limit).all()
 
         return [
             {
-                'id': event.event_id,
-                'defect_type': event.defect_type,
-                'location': event.location,
-                'risk_level': event.risk_level,
-                'detected_date': event.timestamp.strftime('%Y-%m-%d'),
-                'last_detected': event.last_updated.isoformat() if event.last_updated else event.timestamp.isoformat(),
-                'status': event.status,
-                'control_system_sign': event.control_system_sign,
-                'control_system_source': event.control_system_source,
-                'drone_sign': event.drone_sign,
-                'drone_source': event.drone_source,
-                'ai_confidence': event.ai_confidence
+                'id': event_id,
+                'defect_type': defect_type,
+                'location': location,
+                'risk_level': risk_level,
+                'detected_date': timestamp.strftime('%Y-%m-%d'),
+                'last_detected': last_updated.isoformat() if last_updated else timestamp.isoformat(),
+                'status': status,
+                'control_system_sign': control_system_sign,
+                'control_system_source': control_system_source,
+                'drone_sign': drone_sign,
+                'drone_source': drone_source,
+                'ai_confidence': ai_confidence
             }
-            for event in events
+            for (event_id, defect_type, location, risk_level, timestamp, last_updated, status,
+                 control_system_sign, control_system_source, drone_sign, drone_source,
+                 ai_confidence) in rows
         ]
     
     def get_latest_leakage_status(self) -> Dict[str, Any]:
@@ -487,13 +661,15 @@ class DataService:
         Mark all current 'latest' detections as historical
         Called when no new detections are found (system is OK)
         """
-        current_latest = self.db.query(DetectionEvent).filter(
-            DetectionEvent.is_latest == True
-        ).all()
-        
-        for event in current_latest:
-            event.is_latest = False
-            event.last_updated = datetime.now()
-        
+        self._demote_latest_detections(datetime.now())
         self.db.commit()
+    
+    def _demote_latest_detections(self, now: datetime):
+        """Mark 'latest' detections as historical with a single bulk UPDATE"""
+        self.db.query(DetectionEvent).filter(
+            DetectionEvent.is_latest == True
+        ).update(
+            {'is_latest': False, 'last_updated': now},
+            synchronize_session=False
+        )
 
@@ -2,22 +2,118 @@
 Defect Knowledge Base - Comprehensive information for each defect type
 """
 
-from typing import Dict, Any, List
-from enum import Enum
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional, Tuple
+from enum import IntEnum
 
 
-class DataAgreementCase(Enum):
-    """Data agreement scenarios"""
-    BOTH_AGREE = "both_agree"
-    CONTROL_INDICATES = "control_indicates"
-    DRONE_INDICATES = "drone_indicates"
+class DataAgreementCase(IntEnum):
+    """Data agreement scenarios (int-valued for cheap hashing in lookup keys)"""
+    BOTH_AGREE = 0
+    CONTROL_INDICATES = 1
+    DRONE_INDICATES = 2
+
+
+# Markdown section separator shared by all message templates
+_SEP = "━" * 43
+
+# Shared read-only default for missing mappings (no per-call empty dict)
+_EMPTY: Mapping[Any, Any] = MappingProxyType({})
+
+
+def _escape_braces(text: str) -> str:
+    """Escape literal braces so text can be embedded in a str.format template"""
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+def _freeze(value: Any) -> Any:
+    """Recursively convert dicts to read-only mappings and lists to tuples, interning strings"""
+    if isinstance(value, dict):
+        return MappingProxyType({_freeze(k): _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, str):
+        return sys.intern(value)
+    return value
+
+
+@dataclass(frozen=True, slots=True)
+class CaseInfo:
+    """Assessment for one data agreement case of a defect"""
+    confidence: str = 'N/A'
+    message: str = 'N/A'
+    instruction: str = 'N/A'
+
+
+@dataclass(frozen=True, slots=True)
+class DefectEntry:
+    """Knowledge base entry for one defect type"""
+    action_level: str
+    action_description: str
+    primary_recommendation: str
+    problem_detail: str
+    causes: Tuple[str, ...]
+    detailed_actions: Mapping[str, Tuple[str, ...]]
+    ui_message: str
+    data_agreement_cases: Mapping[DataAgreementCase, CaseInfo]
+
+    @classmethod
+    def from_dict(cls, raw: Mapping[str, Any]) -> "DefectEntry":
+        """Build a frozen entry from its dict literal form"""
+        frozen = _freeze(raw)
+        return cls(
+            action_level=frozen.get('action_level', 'N/A'),
+            action_description=frozen.get('action_description', ''),
+            primary_recommendation=frozen.get('primary_recommendation', 'N/A'),
+            problem_detail=frozen.get('problem_detail', 'No detailed information available.'),
+            causes=frozen.get('causes', ()),
+            detailed_actions=frozen.get('detailed_actions', _EMPTY),
+            ui_message=frozen.get('ui_message', ''),
+            data_agreement_cases=MappingProxyType({
+                case: CaseInfo(**case_info)
+                for case, case_info in frozen.get('data_agreement_cases', _EMPTY).items()
+            })
+        )
+
+
+# Placeholder assessment when a defect has no entry for an agreement case
+_UNKNOWN_CASE = CaseInfo()
 
 
 class DefectKnowledge:
     """Knowledge base for pipeline defects"""
     
+    # Sign values that count as a positive detection
+    _POSITIVE_TOKENS = frozenset({'detected', 'positive', 'confirmed', 'yes'})
+    
+    # (control positive, drone positive) -> agreement case
+    _CASE_TABLE: Dict[Tuple[bool, bool], DataAgreementCase] = {
+        (True, True): DataAgreementCase.BOTH_AGREE,
+        (True, False): DataAgreementCase.CONTROL_INDICATES,
+        (False, True): DataAgreementCase.DRONE_INDICATES,
+        (False, False): DataAgreementCase.BOTH_AGREE  # Default to both agree if unclear
+    }
+    
+    # Static initial-message body, detailed-actions block and context-prompt
+    # cause bullets per defect type, built once at import (see below)
+    _PRECOMPUTED_BODIES: Dict[str, str] = {}
+    _ACTIONS_BLOCKS: Dict[str, str] = {}
+    _CAUSES_BULLETS: Dict[str, str] = {}
+    # Display label per detailed_actions category key, e.g. 'immediate_actions' -> 'Immediate Actions'
+    _CATEGORY_LABEL: Dict[str, str] = {}
+    
+    # Complete initial-message templates per (defect type, agreement case), built once at import
+    _INITIAL_MSG_TMPL: Dict[Tuple[str, DataAgreementCase], str] = {}
+    
+    # Agreement case info flattened to (defect type, case) keys, built once at import
+    _CASE_INDEX: Dict[Tuple[str, DataAgreementCase], CaseInfo] = {}
+    
     # Comprehensive defect information
-    DEFECT_INFO: Dict[str, Dict[str, Any]] = {
+    # Written as dict literals, converted to frozen DefectEntry objects at import (see below)
+    DEFECT_INFO: Mapping[str, DefectEntry] = {
         "Major/Sudden Leak": {
             "action_level": "IMMEDIATE ACTION",
             "action_description": "This level is assigned even if only one data source strongly indicates the defect.",
@@ -352,86 +448,56 @@ class DefectKnowledge:
         }
     }
     
-    @classmethod
-    def get_defect_info(cls, defect_type: str) -> Dict[str, Any]:
-        """Get comprehensive information for a defect type"""
-        return cls.DEFECT_INFO.get(defect_type, {})
-    
-    @classmethod
-    def get_initial_chat_message(cls, defect_type: str, location: str, severity: str, 
-                                  control_sign: str = "Unknown", drone_sign: str = "Unknown") -> str:
-        """Generate initial detailed message when chat is opened"""
-        info = cls.get_defect_info(defect_type)
-        if not info:
-            return f"Defect type '{defect_type}' information not available."
-        
-        # Determine data agreement case
-        agreement_case = cls._determine_agreement_case(control_sign, drone_sign)
-        case_info = info.get("data_agreement_cases", {}).get(agreement_case, {})
-        
-        message = f"""
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-**DEFECT ANALYSIS: {defect_type}**
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-**📍 Location:** {location}
-**⚠️ Severity:** {severity}
-**🎯 Action Level:** {info.get('action_level', 'N/A')}
+    # Message templates (separator baked in at class creation, filled with str.format_map per call)
+    _INITIAL_HEADER_TMPL = f"""
+{_SEP}
+**DEFECT ANALYSIS: {{defect_type}}**
+{_SEP}
 
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+**📍 Location:** {{location}}
+**⚠️ Severity:** {{severity}}
+**🎯 Action Level:** {{action_level}}
+"""
+    
+    _STATIC_BODY_TMPL = f"""
+{_SEP}
 **🔍 PROBLEM DETAIL**
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+{_SEP}
 
-{info.get('problem_detail', 'No detailed information available.')}
+{{problem_detail}}
 
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+{_SEP}
 **💡 WHAT CAUSES THIS PROBLEM**
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+{_SEP}
 
 Common causes include:
-"""
-        
-        causes = info.get('causes', [])
-        for i, cause in enumerate(causes, 1):
-            message += f"\n{i}. {cause}"
-        
-        message += f"""
+{{causes}}
 
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+{_SEP}
 **📋 RECOMMENDED ACTIONS**
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+{_SEP}
 
 **Primary Recommendation:**
-{info.get('primary_recommendation', 'N/A')}
-"""
-        
-        # Add detailed actions
-        detailed_actions = info.get('detailed_actions', {})
-        for category, actions in detailed_actions.items():
-            category_name = category.replace('_', ' ').title()
-            message += f"\n\n**{category_name}:**"
-            for action in actions:
-                message += f"\n• {action}"
-        
-        # Add data agreement case information
-        if case_info:
-            message += f"""
+{{primary_recommendation}}
+{{actions}}"""
+    
+    _AGREEMENT_TMPL = f"""
 
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+{_SEP}
 **📊 DATA AGREEMENT ANALYSIS**
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+{_SEP}
 
-**Control System:** {control_sign}
-**Drone Status:** {drone_sign}
+**Control System:** {{control_sign}}
+**Drone Status:** {{drone_sign}}
 
-**AI Confidence:** {case_info.get('confidence', 'N/A')}
-**Assessment:** {case_info.get('message', 'N/A')}
-**Operator Instruction:** {case_info.get('instruction', 'N/A')}
+**AI Confidence:** {{confidence}}
+**Assessment:** {{assessment}}
+**Operator Instruction:** {{instruction}}
 """
-        
-        message += """
+    
+    _INITIAL_FOOTER = f"""
 
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+{_SEP}
 
 **❓ How can I help you further?**
 
@@ -443,60 +509,31 @@ You can ask me:
 • Regulatory compliance requirements
 • Any other questions about addressing this defect
 """
-        
-        return message.strip()
     
-    @classmethod
-    def _determine_agreement_case(cls, control_sign: str, drone_sign: str) -> DataAgreementCase:
-        """Determine which data agreement case applies"""
-        control_positive = control_sign.lower() in ['detected', 'positive', 'confirmed', 'yes']
-        drone_positive = drone_sign.lower() in ['detected', 'positive', 'confirmed', 'yes']
-        
-        if control_positive and drone_positive:
-            return DataAgreementCase.BOTH_AGREE
-        elif control_positive:
-            return DataAgreementCase.CONTROL_INDICATES
-        elif drone_positive:
-            return DataAgreementCase.DRONE_INDICATES
-        else:
-            # Default to both agree if unclear
-            return DataAgreementCase.BOTH_AGREE
-    
-    @classmethod
-    def build_defect_context_prompt(cls, defect_type: str, location: str, severity: str,
-                                     control_sign: str = "Unknown", drone_sign: str = "Unknown") -> str:
-        """Build enhanced context prompt for defect-specific chat"""
-        info = cls.get_defect_info(defect_type)
-        if not info:
-            return ""
-        
-        agreement_case = cls._determine_agreement_case(control_sign, drone_sign)
-        case_info = info.get("data_agreement_cases", {}).get(agreement_case, {})
-        
-        context = f"""
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    _CONTEXT_PROMPT_TMPL = f"""
+{_SEP}
 DEFECT SPECIALIST MODE - ENHANCED CONTEXT
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+{_SEP}
 
 You are a pipeline repair and maintenance specialist consulting with an operator about a specific defect.
 
 **Defect Information:**
-- Type: {defect_type}
-- Location: {location}
-- Severity: {severity}
-- Control System Status: {control_sign}
-- Drone Status: {drone_sign}
+- Type: {{defect_type}}
+- Location: {{location}}
+- Severity: {{severity}}
+- Control System Status: {{control_sign}}
+- Drone Status: {{drone_sign}}
 
-**Action Level:** {info.get('action_level', 'N/A')}
-**Primary Recommendation:** {info.get('primary_recommendation', 'N/A')}
+**Action Level:** {{action_level}}
+**Primary Recommendation:** {{primary_recommendation}}
 
 **Known Causes:**
-{chr(10).join(f"• {cause}" for cause in info.get('causes', []))}
+{{causes_bullets}}
 
 **Data Agreement Assessment:**
-- AI Confidence: {case_info.get('confidence', 'N/A')}
-- Status: {case_info.get('message', 'N/A')}
-- Instruction: {case_info.get('instruction', 'N/A')}
+- AI Confidence: {{confidence}}
+- Status: {{assessment}}
+- Instruction: {{instruction}}
 
 **CRITICAL INSTRUCTIONS:**
 1. The operator has already received the initial detailed problem analysis
@@ -514,6 +551,151 @@ You are a pipeline repair and maintenance specialist consulting with an operator
 - Include resource requirements (time, materials, personnel)
 - Address regulatory and compliance considerations when relevant
 """
+    
+    @classmethod
+    def get_defect_info(cls, defect_type: str) -> Optional[DefectEntry]:
+        """Get comprehensive information for a defect type"""
+        return cls.DEFECT_INFO.get(defect_type)
+    
+    @classmethod
+    def get_initial_chat_message(cls, defect_type: str, location: str, severity: str, 
+                                  control_sign: str = "Unknown", drone_sign: str = "Unknown") -> str:
+        """Generate initial detailed message when chat is opened"""
+        agreement_case = cls._determine_agreement_case(control_sign, drone_sign)
+        template = cls._INITIAL_MSG_TMPL.get((defect_type, agreement_case))
+        if template is None:
+            return f"Defect type '{defect_type}' information not available."
+        
+        return template.format_map({
+            'location': location,
+            'severity': severity,
+            'control_sign': control_sign,
+            'drone_sign': drone_sign
+        })
+    
+    @classmethod
+    def _build_initial_message_template(cls, defect_type: str, agreement_case: DataAgreementCase) -> str:
+        """
+        Assemble the complete initial message for one (defect type, agreement case)
+        Everything static is filled in; only {location}, {severity}, {control_sign}
+        and {drone_sign} are left as placeholders
+        """
+        info = cls.DEFECT_INFO[defect_type]
+        case_info = cls._CASE_INDEX.get((defect_type, agreement_case))
+        
+        parts: List[str] = [
+            cls._INITIAL_HEADER_TMPL.format_map({
+                'defect_type': _escape_braces(defect_type),
+                'location': '{location}',
+                'severity': '{severity}',
+                'action_level': _escape_braces(info.action_level)
+            }),
+            _escape_braces(cls._PRECOMPUTED_BODIES[defect_type])
+        ]
+        
+        # Add data agreement case information
+        if case_info is not None:
+            parts.append(cls._AGREEMENT_TMPL.format_map({
+                'control_sign': '{control_sign}',
+                'drone_sign': '{drone_sign}',
+                'confidence': _escape_braces(case_info.confidence),
+                'assessment': _escape_braces(case_info.message),
+                'instruction': _escape_braces(case_info.instruction)
+            }))
+        
+        parts.append(cls._INITIAL_FOOTER)
+        
+        return "".join(parts).strip()
+    
+    @classmethod
+    def _build_actions_block(cls, info: DefectEntry) -> str:
+        """Build the per-category detailed actions bullet block"""
+        return "".join(
+            f"\n\n**{cls._CATEGORY_LABEL[category]}:**" + "".join(f"\n• {action}" for action in category_actions)
+            for category, category_actions in info.detailed_actions.items()
+        )
+    
+    @classmethod
+    def _build_static_body(cls, defect_type: str, info: DefectEntry) -> str:
+        """Build the static problem/causes/actions section of the initial chat message"""
+        causes = "".join(f"\n{i}. {cause}" for i, cause in enumerate(info.causes, 1))
+        
+        return cls._STATIC_BODY_TMPL.format_map({
+            'problem_detail': info.problem_detail,
+            'causes': causes,
+            'primary_recommendation': info.primary_recommendation,
+            'actions': cls._ACTIONS_BLOCKS[defect_type]
+        })
+    
+    @classmethod
+    def _determine_agreement_case(cls, control_sign: str, drone_sign: str) -> DataAgreementCase:
+        """Determine which data agreement case applies"""
+        return cls._CASE_TABLE[(
+            control_sign.lower() in cls._POSITIVE_TOKENS,
+            drone_sign.lower() in cls._POSITIVE_TOKENS
+        )]
+    
+    @classmethod
+    @lru_cache(maxsize=512)
+    def build_defect_context_prompt(cls, defect_type: str, location: str, severity: str,
+                                     control_sign: str = "Unknown", drone_sign: str = "Unknown") -> str:
+        """
+        Build enhanced context prompt for defect-specific chat
+        Memoized - follow-up messages about the same defect reuse the prompt
+        """
+        info = cls.get_defect_info(defect_type)
+        if info is None:
+            return ""
+        
+        agreement_case = cls._determine_agreement_case(control_sign, drone_sign)
+        case_info = cls._CASE_INDEX.get((defect_type, agreement_case), _UNKNOWN_CASE)
+        
+        context = cls._CONTEXT_PROMPT_TMPL.format_map({
+            'defect_type': defect_type,
+            'location': location,
+            'severity': severity,
+            'control_sign': control_sign,
+            'drone_sign': drone_sign,
+            'action_level': info.action_level,
+            'primary_recommendation': info.primary_recommendation,
+            'causes_bullets': cls._CAUSES_BULLETS[defect_type],
+            'confidence': case_info.confidence,
+            'assessment': case_info.message,
+            'instruction': case_info.instruction
+        })
         
         return context.strip()
 
+
+# Freeze the knowledge base and precompute static message fragments once at import
+DefectKnowledge.DEFECT_INFO = MappingProxyType({
+    defect_type: DefectEntry.from_dict(raw)
+    for defect_type, raw in DefectKnowledge.DEFECT_INFO.items()
+})
+DefectKnowledge._CATEGORY_LABEL = {
+    category: category.replace('_', ' ').title()
+    for info in DefectKnowledge.DEFECT_INFO.values()
+    for category in info.detailed_actions
+}
+DefectKnowledge._ACTIONS_BLOCKS = {
+    defect_type: DefectKnowledge._build_actions_block(info)
+    for defect_type, info in DefectKnowledge.DEFECT_INFO.items()
+}
+DefectKnowledge._PRECOMPUTED_BODIES = {
+    defect_type: DefectKnowledge._build_static_body(defect_type, info)
+    for defect_type, info in DefectKnowledge.DEFECT_INFO.items()
+}
+DefectKnowledge._CAUSES_BULLETS = {
+    defect_type: "\n".join(f"• {cause}" for cause in info.causes)
+    for defect_type, info in DefectKnowledge.DEFECT_INFO.items()
+}
+DefectKnowledge._CASE_INDEX = {
+    (defect_type, case): case_info
+    for defect_type, info in DefectKnowledge.DEFECT_INFO.items()
+    for case, case_info in info.data_agreement_cases.items()
+}
+DefectKnowledge._INITIAL_MSG_TMPL = {
+    (defect_type, case): DefectKnowledge._build_initial_message_template(defect_type, case)
+    for defect_type in DefectKnowledge.DEFECT_INFO
+    for case in DataAgreementCase
+}
@@ -1,8 +1,11 @@
 """
 FastAPI backend for Pipeline Leakage Detection System
 """
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from contextlib import asynccontextmanager
 
 from app.api import auth, chat, detection
@@ -17,15 +20,16 @@ async def lifespan(app: FastAPI):
     """
     Lifespan context manager for FastAPI application
     """
-    # Create database tables
-    Base.metadata.create_all(bind=engine)
+    # Create database tables (DB I/O runs in a worker thread, keeping the event loop free)
+    await asyncio.to_thread(Base.metadata.create_all, bind=engine)
 
     # Initialize database with default data
-    init_db()
+    await asyncio.to_thread(init_db)
 
     yield
 
-    # Cleanup (if needed)
+    # Cleanup: close the chat service's pooled HTTP client and batch workers
+    chat.chat_service.close()
 
 
 app = FastAPI(
@@ -40,10 +44,13 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.BACKEND_CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=("GET", "POST", "PUT", "DELETE", "OPTIONS"),
+    allow_headers=("Authorization", "Content-Type", "X-Requested-With"),
 )
 
+# Compress larger responses (chat Markdown, CSV data listings)
+app.add_middleware(GZipMiddleware, minimum_size=512, compresslevel=5)
+
 
 # Startup event to ensure init_db runs
 @app.on_event("startup")
@@ -15,86 +15,115 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from sqlalchemy import create_engine, text, inspect
-from app.core.config import settings
-from app.db.session import SessionLocal
+from sqlalchemy import func, inspect, select, text, update
+from app.db.session import engine
 from app.models.detection import DetectionEvent
 
 
+# ADD COLUMN statement per dialect; SQLite stores booleans as integers
+ADD_COLUMN_SQL = {
+    'sqlite': "ALTER TABLE detection_events ADD COLUMN is_latest BOOLEAN DEFAULT 0 NOT NULL",
+}
+DEFAULT_ADD_COLUMN_SQL = "ALTER TABLE detection_events ADD COLUMN is_latest BOOLEAN NOT NULL DEFAULT FALSE"
+
+# Indexes declared on the model (see DetectionEvent.__table_args__). The partial
+# is_latest index only exists where partial indexes are supported; elsewhere the
+# composite (is_latest, last_updated) index serves the same lookups
+LATEST_INDEX_NAME = 'ix_detection_events_is_latest'
+COMPOSITE_INDEX_NAME = 'ix_detevt_latest_updated'
+PARTIAL_INDEX_DIALECTS = ('sqlite', 'postgresql')
+
+
 def migrate_add_is_latest():
     """Add is_latest column and set appropriate values"""
     print("=" * 60)
     print("Starting migration: Adding 'is_latest' column")
     print("=" * 60)
     
-    # Create engine
-    engine = create_engine(settings.DATABASE_URL)
+    add_column_sql = ADD_COLUMN_SQL.get(engine.dialect.name, DEFAULT_ADD_COLUMN_SQL)
+    index_name = LATEST_INDEX_NAME if engine.dialect.name in PARTIAL_INDEX_DIALECTS else COMPOSITE_INDEX_NAME
+    latest_index = next(i for i in DetectionEvent.__table__.indexes if i.name == index_name)
     
-    # Step 1: Check if column exists and add if needed
-    with engine.connect() as conn:
-        try:
-            # Check if column exists using inspector
-            inspector = inspect(engine)
-            columns = [col['name'] for col in inspector.get_columns('detection_events')]
-            
-            if 'is_latest' not in columns:
-                print("\n[1/3] Adding 'is_latest' column to detection_events table...")
-                conn.execute(text(
-                    "ALTER TABLE detection_events ADD COLUMN is_latest BOOLEAN DEFAULT 0"
-                ))
-                conn.commit()
-                print("      ✓ Column 'is_latest' added successfully")
-            else:
-                print("\n[1/3] Column 'is_latest' already exists")
-                print("      ✓ Skipping column creation")
-        except Exception as e:
-            print(f"      ✗ Error adding column: {e}")
-            return False
+    try:
+        # Check if column exists before opening the migration transaction (the inspector uses its own connection)
+        inspector = inspect(engine)
+        columns = {col['name'] for col in inspector.get_columns('detection_events')}
+        indexes = {ix['name'] for ix in inspector.get_indexes('detection_events')}
+    except Exception as e:
+        print(f"      ✗ Error inspecting detection_events table: {e}")
+        return False
     
-    # Step 2: Set is_latest values
-    db = SessionLocal()
     try:
-        print("\n[2/3] Setting is_latest values...")
-        
-        # Get all detection events ordered by last_updated (most recent first)
-        all_events = db.query(DetectionEvent).order_by(
-            DetectionEvent.last_updated.desc()
-        ).all()
-        
-        if not all_events:
-            print("      ℹ No detection events found in database")
-            print("      ✓ Migration completed (no data to migrate)")
-            return True
-        
-        print(f"      Found {len(all_events)} detection events")
-        
-        # Mark all as historical first
-        for event in all_events:
-            event.is_latest = False
-        
-        # Mark only the most recent 1-3 as latest (simulate current active detections)
-        # For migration, we'll mark the most recent 1 as latest
-        if all_events:
-            all_events[0].is_latest = True
-            print(f"      ✓ Marked event '{all_events[0].event_id}' as latest")
-        
-        db.commit()
-        
-        print("\n[3/3] Migration completed successfully!")
-        print(f"      - Latest detections: 1")
-        print(f"      - Historical detections: {len(all_events) - 1}")
-        print("\n" + "=" * 60)
-        print("✓ Database migration successful!")
-        print("=" * 60)
-        
-        return True
-        
+        # One transaction with a SAVEPOINT per step: a failed backfill rolls back only
+        # step 2, the column/index from step 1 still commit and a re-run skips the ALTER
+        with engine.begin() as conn:
+            # Step 1: Add the column if needed
+            with conn.begin_nested():
+                if 'is_latest' not in columns:
+                    print("\n[1/3] Adding 'is_latest' column to detection_events table...")
+                    conn.execute(text(add_column_sql))
+                    print("      ✓ Column 'is_latest' added")
+                else:
+                    print("\n[1/3] Column 'is_latest' already exists")
+                    print("      ✓ Skipping column creation")
+                
+                if index_name not in indexes:
+                    latest_index.create(bind=conn)
+                    print(f"      ✓ Index '{index_name}' created")
+            
+            # Step 2: Set is_latest values with server-side UPDATEs (no rows loaded into Python).
+            # If per-row logic is ever needed here, stream ids with
+            # execution_options(stream_results=True, yield_per=1000) instead of fetching all rows.
+            print("\n[2/3] Setting is_latest values...")
+            try:
+                with conn.begin_nested():
+                    # A freshly added column already defaults every row to historical; on re-runs
+                    # only the few rows currently flagged latest need resetting
+                    if 'is_latest' in columns:
+                        conn.execute(
+                            update(DetectionEvent)
+                            .where(DetectionEvent.is_latest == True)
+                            .values(is_latest=False)
+                        )
+                    
+                    # Mark only the most recent detection as latest (fetch just its id/event_id).
+                    # Ids increase with insertion, so the primary key finds the newest event without
+                    # sorting; last_updated is also bumped by status changes and demotion.
+                    latest = conn.execute(
+                        select(DetectionEvent.id, DetectionEvent.event_id)
+                        .order_by(DetectionEvent.id.desc())
+                        .limit(1)
+                    ).first()
+                    if latest is None:
+                        print("      ℹ No detection events found in database")
+                        print("      ✓ Migration completed (no data to migrate)")
+                        return True
+                    
+                    conn.execute(
+                        update(DetectionEvent)
+                        .where(DetectionEvent.id == latest.id)
+                        .values(is_latest=True)
+                    )
+                    total = conn.execute(select(func.count(DetectionEvent.id))).scalar()
+            except Exception as e:
+                print(f"      ✗ Error setting is_latest values, step 2 rolled back: {e}")
+                print("      ℹ Re-run the migration to finish the backfill")
+                return False
     except Exception as e:
-        print(f"\n      ✗ Error setting is_latest values: {e}")
-        db.rollback()
+        print(f"\n      ✗ Migration rolled back: {e}")
         return False
-    finally:
-        db.close()
+    
+    print(f"      Found {total} detection events")
+    print(f"      ✓ Marked event '{latest.event_id}' as latest")
+    
+    print("\n[3/3] Migration completed successfully!")
+    print(f"      - Latest detections: 1")
+    print(f"      - Historical detections: {total - 1}")
+    print("\n" + "=" * 60)
+    print("✓ Database migration successful!")
+    print("=" * 60)
+    
+    return True
 
 
 if __name__ == "__main__":
@@ -0,0 +1,42 @@
+"""
+Database migration script to add the (is_latest, last_updated) index to detection_events
+
+New databases get the index from the model via create_all; this script adds it
+to databases created before the index was declared.
+
+Usage:
+    python migrate_add_latest_index.py
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.db.session import engine
+from app.models.detection import DetectionEvent
+
+
+INDEX_NAME = 'ix_detevt_latest_updated'
+
+
+def migrate_add_latest_index():
+    """Create the composite is_latest/last_updated index if it is missing"""
+    print("=" * 60)
+    print(f"Starting migration: Adding '{INDEX_NAME}' index")
+    print("=" * 60)
+    
+    index = next(i for i in DetectionEvent.__table__.indexes if i.name == INDEX_NAME)
+    
+    try:
+        index.create(bind=engine, checkfirst=True)
+        print(f"\n      ✓ Index '{INDEX_NAME}' is present")
+        return True
+    except Exception as e:
+        print(f"      ✗ Error creating index: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    success = migrate_add_latest_index()
+    sys.exit(0 if success else 1)